@@ -0,0 +1,40 @@
+import pytest
+
+from analytics import calculate_dividend_safety_score, calculate_dividend_capture_strategy, calculate_portfolio_analytics
+from conftest import make_holdings
+
+SAFETY_INPUTS = [
+    ((i * 7) % 110, (i % 25) - 5, (i % 30) / 10, 0.6 + (i % 6) / 10)
+    for i in range(10_000)
+]
+
+
+def test_safety_score_single(benchmark):
+    result = benchmark(calculate_dividend_safety_score, payout_ratio=55, earnings_growth=6, debt_to_equity=0.8)
+    assert result["grade"] in "ABCDF"
+
+
+def test_safety_score_10k(benchmark):
+    def run():
+        return [calculate_dividend_safety_score(p, g, d, f) for p, g, d, f in SAFETY_INPUTS]
+
+    results = benchmark(run)
+    assert len(results) == len(SAFETY_INPUTS)
+
+
+def test_capture_strategy_1k(benchmark):
+    def run():
+        return [
+            calculate_dividend_capture_strategy(f"T{i}", "2025-03-01", 0.2 + (i % 10) / 10, 50.0 + i % 300, 30 + i % 60)
+            for i in range(1_000)
+        ]
+
+    results = benchmark(run)
+    assert len(results) == 1_000
+
+
+@pytest.mark.parametrize("n", [10, 1_000, 10_000])
+def test_portfolio_analytics(benchmark, n):
+    holdings = make_holdings(n)
+    result = benchmark(calculate_portfolio_analytics, holdings)
+    assert result["holdings_count"] == n
@@ -0,0 +1,33 @@
+from collections import OrderedDict
+
+import pytest
+
+import cache
+from cache import cache_result
+
+
+def _payload(x):
+    return {"ticker": x, "price": 1.0}
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    """Measure the in-process backend; Redis round-trips would dominate otherwise."""
+    monkeypatch.setattr(cache, "_redis", None)
+    monkeypatch.setattr(cache, "_mem_cache", OrderedDict())
+
+
+def test_uncached_call(benchmark):
+    benchmark(_payload, "AAPL")
+
+
+def test_cache_hit(benchmark):
+    cached = cache_result(ttl=300)(_payload)
+    cached("AAPL")
+    assert benchmark(cached, "AAPL") == _payload("AAPL")
+
+
+def test_cache_miss(benchmark):
+    cached = cache_result(ttl=300)(_payload)
+    counter = iter(range(10**9))
+    benchmark(lambda: cached(f"T{next(counter)}"))
@@ -0,0 +1,61 @@
+"""Serialization time and peak memory: default FastAPI path vs FastJSONResponse vs streaming.
+
+    cd backend && python benchmarks/bench_json_response.py --days 3650
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse, StreamingJSONResponse, ORJSON_ENABLED
+from conftest import make_historical
+
+
+def default_path(payload):
+    return len(JSONResponse(jsonable_encoder(payload)).body)
+
+
+def fast_path(payload):
+    return len(FastJSONResponse(payload).body)
+
+
+def streaming_path(payload):
+    async def drain():
+        size = 0
+        async for chunk in StreamingJSONResponse(payload).body_iterator:
+            size += len(chunk)
+        return size
+    return asyncio.run(drain())
+
+
+def measure(fn, payload, repeat):
+    fn(payload)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = fn(payload)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    fn(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = make_historical(args.days)
+    print(f"{args.days} bars, orjson={'yes' if ORJSON_ENABLED else 'no'}")
+    for name, fn in [("default", default_path), ("fast", fast_path), ("streaming", streaming_path)]:
+        elapsed, peak, size = measure(fn, payload, args.repeat)
+        print(f"{name:10s} {elapsed * 1000:9.2f} ms  peak {peak / 1024:9.1f} KiB  body {size / 1024:9.1f} KiB")
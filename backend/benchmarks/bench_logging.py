@@ -0,0 +1,118 @@
+"""Request throughput with logging disabled, synchronous text logging and the queued JSON pipeline.
+
+Runs offline: DataProvider is replaced with canned payloads so only the
+API + logging overhead is measured. Log output goes to a real file, and each
+write is delayed by --write-latency-ms to model a slow sink (a pipe into a
+container log driver, a busy disk); pass 0 to measure plain file writes.
+
+    cd backend && python benchmarks/bench_logging.py --requests 5000
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+import main
+import logging_config
+from data_provider import DataProvider
+
+ROUTES = ["/api/price/AAPL", "/api/dividends/AAPL?limit=5", "/health"]
+MODES = ["off", "sync-text", "queue-json", "queue-json-sampled"]
+
+
+def _stub_provider():
+    DataProvider.get_price = staticmethod(lambda ticker: {"ticker": ticker.upper(), "price": 100.0, "timestamp": "2025-01-01T00:00:00", "source": "stub"})
+    DataProvider.get_dividends = staticmethod(lambda ticker, limit=10: {"dividends": [{"date": "2025-01-01T00:00:00", "amount": 0.25}] * limit})
+
+
+class SlowStream:
+    """File wrapper whose flush() blocks for `latency` seconds, like a congested pipe."""
+
+    def __init__(self, f, latency: float):
+        self.f = f
+        self.latency = latency
+
+    def write(self, data):
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def _configure(mode: str, sink):
+    logging_config.stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.disable(logging.NOTSET)
+    # TestClient's own "HTTP Request: ..." lines are client-side noise, not server logging
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if mode == "off":
+        logging.disable(logging.CRITICAL)
+    elif mode == "sync-text":
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    elif mode == "queue-json":
+        logging_config.setup_logging(level="INFO", fmt="json", sample_rates={}, stream=sink)
+    elif mode == "queue-json-sampled":
+        logging_config.setup_logging(level="INFO", fmt="json", sample_rates={"/api/price": 0.01}, stream=sink)
+
+
+def _measure(client, mode, sink, n_requests):
+    _configure(mode, sink)
+    for route in ROUTES:
+        client.get(route)  # warm-up
+    start = time.perf_counter()
+    for i in range(n_requests):
+        client.get(ROUTES[i % len(ROUTES)])
+    elapsed = time.perf_counter() - start
+    # Queued modes keep writing after the last response; report that backlog separately
+    drain_start = time.perf_counter()
+    logging_config.stop_logging()
+    return n_requests / elapsed, time.perf_counter() - drain_start
+
+
+def run(n_requests: int, sink_path: str = None, write_latency: float = 0.0002, rounds: int = 3):
+    """Median req/s and drain time per mode over `rounds` interleaved rounds."""
+    _stub_provider()
+    client = TestClient(main.app)
+    if sink_path is None:
+        fd, sink_path = tempfile.mkstemp(prefix="bench_logging_", suffix=".log")
+        os.close(fd)
+    samples = {mode: [] for mode in MODES}
+    with open(sink_path, "w") as f:
+        sink = SlowStream(f, write_latency)
+        _measure(client, "off", sink, min(n_requests, 500))  # process warm-up
+        for _ in range(rounds):
+            for mode in MODES:
+                samples[mode].append(_measure(client, mode, sink, n_requests))
+    logging.disable(logging.NOTSET)
+    results = {
+        mode: (statistics.median(r for r, _ in runs), statistics.median(d for _, d in runs))
+        for mode, runs in samples.items()
+    }
+    return results, sink_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--sink", help="file the log output is written to (default: a temp file)")
+    parser.add_argument("--write-latency-ms", type=float, default=0.2, help="delay added to every log flush")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    results, sink_path = run(args.requests, args.sink, args.write_latency_ms / 1000, args.rounds)
+    print(f"log sink: {sink_path} (+{args.write_latency_ms} ms per write)")
+    baseline = results["off"][0]
+    for mode, (rps, drain) in results.items():
+        print(f"{mode:20s} {rps:10.1f} req/s  ({rps / baseline * 100:5.1f}% of logging off)  drain {drain:6.3f}s")
@@ -0,0 +1,44 @@
+import pytest
+
+from screener import ScreenerIndex
+from conftest import make_universe
+
+N = 5_000
+
+
+@pytest.fixture(scope="module")
+def index():
+    idx = ScreenerIndex()
+    idx.upsert_many(make_universe(N))
+    return idx
+
+
+def test_build_index(benchmark):
+    universe = make_universe(N)
+
+    def build():
+        idx = ScreenerIndex()
+        idx.upsert_many(universe)
+        return idx
+
+    assert len(benchmark(build)) == N
+
+
+def test_query_unfiltered_page(benchmark, index):
+    result = benchmark(index.query, sort="yield", limit=50)
+    assert result["total"] == N
+
+
+def test_query_yield_and_grade(benchmark, index):
+    result = benchmark(index.query, min_yield=3, min_grade="B", sort="yield", limit=50)
+    assert all(row["dividend_yield"] >= 3 and row["score"] >= 80 for row in result["results"])
+
+
+def test_query_multi_filter_sorted_by_score(benchmark, index):
+    result = benchmark(index.query, min_yield=2, max_payout_ratio=60, max_debt_to_equity=1.0, sort="score", offset=20, limit=20)
+    assert len(result["results"]) <= 20
+
+
+def test_incremental_rescore(benchmark, index):
+    counter = iter(range(10**9))
+    benchmark(lambda: index.upsert(f"T{next(counter) % N:05d}", payout_ratio=next(counter) % 110))
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse
+from conftest import make_historical
+
+
+@pytest.mark.parametrize("days", [30, 365, 3650])
+def test_json_dumps_historical(benchmark, days):
+    payload = make_historical(days)
+    body = benchmark(json.dumps, payload)
+    assert body.startswith('{"data"')
+
+
+@pytest.mark.parametrize("days", [30, 365, 3650])
+def test_jsonable_encoder_historical(benchmark, days):
+    """The pass FastAPI runs over every handler return value before encoding."""
+    payload = make_historical(days)
+    result = benchmark(jsonable_encoder, payload)
+    assert len(result["data"]) == days
+
+
+@pytest.mark.parametrize("days", [30, 365, 3650])
+def test_default_response_path(benchmark, days):
+    """What FastAPI does for a returned dict: jsonable_encoder, then JSONResponse.render."""
+    payload = make_historical(days)
+    body = benchmark(lambda: JSONResponse(jsonable_encoder(payload)).body)
+    assert body.startswith(b'{"data"')
+
+
+@pytest.mark.parametrize("days", [30, 365, 3650])
+def test_fast_response_path(benchmark, days):
+    payload = make_historical(days)
+    body = benchmark(lambda: FastJSONResponse(payload).body)
+    assert body.startswith(b'{"data"')
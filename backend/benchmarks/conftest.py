@@ -0,0 +1,75 @@
+import os
+import sys
+import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_provider import DataProvider
+
+
+def make_price(ticker: str):
+    return {"ticker": ticker.upper(), "price": 187.25, "timestamp": "2025-01-02T00:00:00", "source": "stub"}
+
+
+def make_historical(days: int = 30):
+    """Synthetic daily bars shaped exactly like DataProvider.get_historical output."""
+    start = datetime.datetime(2015, 1, 1)
+    rows = []
+    for i in range(days):
+        base = 100.0 + (i % 250) * 0.37
+        rows.append({
+            "date": (start + datetime.timedelta(days=i)).isoformat(),
+            "Open": base,
+            "High": base * 1.012,
+            "Low": base * 0.988,
+            "Close": base * 1.003,
+            "Volume": 1_000_000 + i * 17,
+        })
+    return {"data": rows}
+
+
+def make_dividends(limit: int = 10):
+    start = datetime.datetime(2025, 1, 1)
+    return {"dividends": [
+        {"date": (start - datetime.timedelta(days=91 * i)).isoformat(), "amount": 0.24 + 0.01 * (i % 4)}
+        for i in range(limit)
+    ]}
+
+
+def make_holdings(n: int):
+    return [
+        {
+            "symbol": f"T{i:05d}",
+            "shares": 1 + i % 200,
+            "currentPrice": 20.0 + (i % 500) * 0.9,
+            "dividendYield": (i % 80) / 10,
+            "payoutRatio": (i * 7) % 110,
+            "earningsGrowth": (i % 25) - 5,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def stub_provider(monkeypatch):
+    """Serve canned payloads so benchmarks never touch the network."""
+    monkeypatch.setattr(DataProvider, "get_price", staticmethod(make_price))
+    monkeypatch.setattr(DataProvider, "get_historical", staticmethod(lambda ticker, days=30: make_historical(days)))
+    monkeypatch.setattr(DataProvider, "get_dividends", staticmethod(lambda ticker, limit=10: make_dividends(limit)))
+
+
+def make_universe(n: int):
+    """Synthetic screener fundamentals for `n` tickers."""
+    return [
+        {
+            "ticker": f"T{i:05d}",
+            "dividend_yield": (i * 37 % 1000) / 100,
+            "payout_ratio": (i * 7) % 110,
+            "earnings_growth": (i % 25) - 5,
+            "debt_to_equity": (i % 30) / 10,
+            "free_cash_flow_trend": 0.6 + (i % 6) / 10,
+        }
+        for i in range(n)
+    ]
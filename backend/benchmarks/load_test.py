@@ -0,0 +1,192 @@
+"""Async load generator reporting RPS / p50 / p99 per API route.
+
+By default the app is driven in-process through httpx's ASGI transport with a
+stubbed DataProvider, so results are offline and repeatable. Pass --base-url
+to hit a running server instead.
+
+    cd backend
+    python benchmarks/load_test.py --requests 2000 --concurrency 50 --save benchmarks/baselines/load.json
+    python benchmarks/load_test.py --compare benchmarks/baselines/load.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import platform
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+
+DEMO_LOGIN = {"email": "demo@example.com", "password": "password123"}
+BENCH_ADMIN_KEY = "bench-admin-key"
+
+# name -> (method, path, json body, headers). "{token}" / "{admin_key}" in the path and
+# headers are filled in per run; a callable body is called with a process-wide request
+# number so e.g. registrations stay unique across warm-up and measured runs.
+ROUTES = {
+    "health": ("GET", "/health", None, None),
+    "auth_register": ("POST", "/api/auth/register", lambda n: {"email": f"bench-{os.getpid()}-{n}@example.com", "password": "pw"}, None),
+    "auth_login": ("POST", "/api/auth/login", DEMO_LOGIN, None),
+    "auth_me": ("GET", "/api/auth/me?token={token}", None, None),
+    "subscription_plans": ("GET", "/api/subscription/plans", None, None),
+    "subscription_upgrade": ("POST", "/api/subscription/upgrade?tier=premium&token={token}", None, None),
+    "payment_crypto": ("POST", "/api/payment/crypto?crypto_type=bitcoin&amount=9.99&token={token}", None, None),
+    "price": ("GET", "/api/price/AAPL", None, None),
+    "historical": ("GET", "/api/historical/AAPL?days=30", None, None),
+    "historical_10y": ("GET", "/api/historical/AAPL?days=3650", None, None),
+    "dividends": ("GET", "/api/dividends/AAPL?limit=10", None, None),
+    "safety_score": ("POST", "/api/dividend/safety-score", {"ticker": "JNJ", "payout_ratio": 45, "earnings_growth": 6, "debt_to_equity": 0.4}, None),
+    "capture_strategy": ("POST", "/api/dividend/capture-strategy", {"ticker": "JNJ", "ex_dividend_date": "2025-03-01", "dividend_amount": 1.19, "current_price": 150.0}, None),
+    "portfolio_analytics": ("GET", "/api/portfolio/analytics?token={token}", None, None),
+    "screener": ("GET", "/api/screener?min_yield=3&min_grade=B&sort=yield&limit=50", None, None),
+    "screener_fundamentals": ("POST", "/api/screener/fundamentals",
+                              lambda n: [{"ticker": f"T{n % 5000:05d}", "dividend_yield": 3.5, "payout_ratio": (n * 7) % 100}],
+                              {"X-Admin-Key": "{admin_key}"}),
+}
+
+_request_ids = itertools.count()
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _install_stubs():
+    from conftest import make_price, make_historical, make_dividends, make_universe
+    from data_provider import DataProvider
+    from screener import screener_index
+    screener_index.upsert_many(make_universe(5_000))
+    DataProvider.get_price = staticmethod(make_price)
+    DataProvider.get_historical = staticmethod(lambda ticker, days=30: make_historical(days))
+    DataProvider.get_dividends = staticmethod(lambda ticker, limit=10: make_dividends(limit))
+
+
+def _client(base_url: str = None):
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=30)
+    _install_stubs()
+    import main
+    main.SCREENER_ADMIN_KEY = BENCH_ADMIN_KEY
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=30)
+
+
+async def _demo_token(client):
+    resp = await client.post("/api/auth/login", json=DEMO_LOGIN)
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def _run_route(client, route, params, n_requests, concurrency):
+    method, path, body, headers = route
+    path = path.format(**params)
+    headers = {k: v.format(**params) for k, v in (headers or {}).items()}
+    latencies = []
+    errors = 0
+    remaining = iter(range(n_requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            payload = body(next(_request_ids)) if callable(body) else body
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path, json=payload, headers=headers)
+                if resp.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": n_requests,
+        "errors": errors,
+        "rps": round(n_requests / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run(routes, n_requests: int, concurrency: int, base_url: str = None, admin_key: str = None):
+    results = {}
+    async with _client(base_url) as client:
+        params = {"token": await _demo_token(client), "admin_key": admin_key or BENCH_ADMIN_KEY}
+        for name in routes:
+            await _run_route(client, ROUTES[name], params, min(n_requests, 50), concurrency)  # warm-up
+            results[name] = await _run_route(client, ROUTES[name], params, n_requests, concurrency)
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """Print per-route deltas; return the names whose RPS or p99 regressed beyond threshold (fraction)."""
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get("routes", {}).get(name)
+        if not base:
+            continue
+        rps_delta = (cur["rps"] - base["rps"]) / base["rps"] if base["rps"] else 0.0
+        p99_delta = (cur["p99_ms"] - base["p99_ms"]) / base["p99_ms"] if base["p99_ms"] else 0.0
+        flag = ""
+        if rps_delta < -threshold or p99_delta > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:20s} rps {rps_delta * 100:+6.1f}%  p99 {p99_delta * 100:+6.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--routes", nargs="*", default=list(ROUTES), choices=list(ROUTES))
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--admin-key", default=os.getenv("SCREENER_ADMIN_KEY"), help="X-Admin-Key for screener writes against --base-url")
+    parser.add_argument("--save", help="write results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed regression fraction (default 0.10)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.routes, args.requests, args.concurrency, args.base_url, args.admin_key))
+    for name, r in results.items():
+        print(f"{name:20s} {r['rps']:9.1f} req/s  p50 {r['p50_ms']:8.3f} ms  p99 {r['p99_ms']:8.3f} ms  errors {r['errors']}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({
+                "commit": _commit(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "target": args.base_url or "in-process",
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "routes": results,
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
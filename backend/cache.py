@@ -1,12 +1,18 @@
 import os
 import json
 import time
+import threading
+from collections import OrderedDict
 from functools import wraps
 
 REDIS_URL = os.getenv("REDIS_URL")
+# Upper bound on in-memory entries; least recently used ones are evicted first
+MEM_CACHE_MAX_ENTRIES = int(os.getenv("MEM_CACHE_MAX_ENTRIES", "1024"))
 CACHING_ENABLED = False
 
-_mem_cache = {}
+_mem_cache = OrderedDict()
+# cache_result.refresh() writes from worker threads (see prewarm.py)
+_mem_lock = threading.Lock()
 
 try:
     if REDIS_URL:
@@ -26,44 +32,74 @@ if _redis is None:
 
 
 def _mem_get(key):
-    entry = _mem_cache.get(key)
-    if not entry:
-        return None
-    value, expire = entry
-    if expire is not None and time.time() > expire:
-        del _mem_cache[key]
-        return None
-    return value
+    with _mem_lock:
+        entry = _mem_cache.get(key)
+        if not entry:
+            return None
+        value, expire = entry
+        if expire is not None and time.time() > expire:
+            del _mem_cache[key]
+            return None
+        _mem_cache.move_to_end(key)
+        return value
 
 
 def _mem_set(key, value, ttl=None):
     expire = time.time() + ttl if ttl else None
-    _mem_cache[key] = (value, expire)
+    with _mem_lock:
+        _mem_cache[key] = (value, expire)
+        _mem_cache.move_to_end(key)
+        while len(_mem_cache) > MEM_CACHE_MAX_ENTRIES:
+            _mem_cache.popitem(last=False)
 
 
-def cache_result(ttl: int = 60):
-    """Decorator to cache function results in Redis (if available) or memory."""
+def cache_result(ttl: int = 60, cache_if=None):
+    """Decorator to cache function results in Redis (if available) or memory.
+
+    `cache_if(result)` can veto storing a result (e.g. error payloads). The
+    wrapped function gains `refresh(*args, cache_ttl=None, **kwargs)`, which
+    recomputes and overwrites the cached entry; `cache_ttl` extends its
+    lifetime by that many seconds on top of the normal `ttl`.
+    """
     def decorator(func):
+        def _key(args, kwargs):
+            return f"{func.__module__}.{func.__name__}:{args}:{kwargs}"
+
+        def _store(key, result, expire):
+            if cache_if is not None and not cache_if(result):
+                return
+            if _redis:
+                _redis.set(key, json.dumps(result), ex=expire)
+            else:
+                _mem_set(key, result, expire)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             try:
-                key = f"{func.__module__}.{func.__name__}:{args}:{kwargs}"
+                key = _key(args, kwargs)
                 if _redis:
                     raw = _redis.get(key)
                     if raw:
                         return json.loads(raw)
-                    result = func(*args, **kwargs)
-                    _redis.set(key, json.dumps(result), ex=ttl)
-                    return result
                 else:
                     raw = _mem_get(key)
                     if raw is not None:
                         return raw
-                    result = func(*args, **kwargs)
-                    _mem_set(key, result, ttl)
-                    return result
+                result = func(*args, **kwargs)
+                _store(key, result, ttl)
+                return result
             except Exception:
                 # on any cache error fall back to computing
                 return func(*args, **kwargs)
+
+        def refresh(*args, cache_ttl: int = None, **kwargs):
+            result = func(*args, **kwargs)
+            try:
+                _store(_key(args, kwargs), result, ttl + (cache_ttl or 0))
+            except Exception:
+                pass
+            return result
+
+        wrapper.refresh = refresh
         return wrapper
     return decorator
@@ -2,9 +2,19 @@ import os
 import datetime
 import traceback
 import pandas as pd
+from cache import cache_result
 
 CURRENT_PROVIDER = os.getenv("CURRENT_PROVIDER", "yfinance")
 
+# Cache TTLs (seconds) for provider calls; the pre-warm scheduler may store entries for longer
+PRICE_TTL = int(os.getenv("PRICE_TTL", "60"))
+HISTORICAL_TTL = int(os.getenv("HISTORICAL_TTL", "900"))
+DIVIDENDS_TTL = int(os.getenv("DIVIDENDS_TTL", "3600"))
+
+
+def _cacheable(result):
+    return "error" not in result
+
 
 class DataProvider:
     """Simple provider using yfinance when available. Returns consistent JSON shapes.
@@ -20,6 +30,7 @@ class DataProvider:
             return None
 
     @staticmethod
+    @cache_result(ttl=PRICE_TTL, cache_if=_cacheable)
     def get_price(ticker: str):
         try:
             t = DataProvider._safe_ticker(ticker)
@@ -37,6 +48,7 @@ class DataProvider:
             return {"error": "Failed to fetch price", "detail": traceback.format_exc()}
 
     @staticmethod
+    @cache_result(ttl=HISTORICAL_TTL, cache_if=_cacheable)
     def get_historical(ticker: str, days: int = 30):
         try:
             t = DataProvider._safe_ticker(ticker)
@@ -61,6 +73,7 @@ class DataProvider:
             return {"error": "Failed to fetch historical", "detail": traceback.format_exc(), "data": []}
 
     @staticmethod
+    @cache_result(ttl=DIVIDENDS_TTL, cache_if=_cacheable)
     def get_dividends(ticker: str, limit: int = 10):
         try:
             t = DataProvider._safe_ticker(ticker)
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import atexit
+import queue
+import random
+import logging
+import logging.handlers
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# e.g. "/api/price=0.01,/api/historical=0.1" -> keep 1% / 10% of INFO logs for those routes
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "/api/price=0.1")
+
+# Attributes present on every LogRecord; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime"}
+
+_listener = None
+
+
+def parse_sample_rates(spec: str) -> dict:
+    """Parse "route=rate,route=rate" into {route: rate}; malformed entries are ignored."""
+    rates = {}
+    for item in (spec or "").split(","):
+        route, sep, rate = item.partition("=")
+        if not sep:
+            continue
+        try:
+            rates[route.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line, including any `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RouteSampler(logging.Filter):
+    """Keep only a fraction of sub-WARNING records tagged with a high-volume `route`."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "route", None))
+        if rate is None:
+            return True
+        return random.random() < rate
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers message formatting to the listener thread.
+
+    The stock `prepare()` calls `format()` on the caller's thread; here the
+    record is enqueued as-is so `%`-style args are only interpolated off the
+    event loop.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level: str = None, fmt: str = None, sample_rates: dict = None, stream=None):
+    """Route root logging through a queue drained by a background listener thread.
+
+    Safe to call more than once; the previous listener is stopped and replaced.
+    """
+    global _listener
+    level = (level or LOG_LEVEL).upper()
+    fmt = (fmt or LOG_FORMAT).lower()
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(LOG_SAMPLE_RATES)
+
+    output = logging.StreamHandler(stream)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(RouteSampler(sample_rates))
+
+    root = logging.getLogger()
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush pending records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
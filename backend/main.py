@@ -1,28 +1,41 @@
-from fastapi import FastAPI, Query, HTTPException, Depends
+from dotenv import load_dotenv
+
+# Load backend/.env before the local modules below read their settings at import time
+load_dotenv()
+
+from fastapi import FastAPI, Query, Header, HTTPException, Depends
+from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from data_provider import DataProvider, CURRENT_PROVIDER
 from cache import CACHING_ENABLED
 from auth import create_access_token, verify_token, USERS_DB, SUBSCRIPTION_TIERS
 from analytics import calculate_dividend_safety_score, calculate_dividend_capture_strategy, calculate_portfolio_analytics
+from logging_config import setup_logging
+from responses import FastJSONResponse, StreamingJSONResponse
+from screener import screener_index, SORT_FIELDS, TICKER_PATTERN, SCREENER_ADMIN_KEY, SCREENER_MAX_BATCH
+from prewarm import PREWARM_ENABLED, scheduler as prewarm_scheduler, tracker as hot_tickers
+from contextlib import asynccontextmanager
 import uvicorn
-from dotenv import load_dotenv
 import os
 import logging
 import pathlib
 import hashlib
+import hmac
 
-# Configure structured logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Structured JSON logging via a background queue listener (see logging_config.py)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if PREWARM_ENABLED:
+        prewarm_scheduler.start()
+    yield
+    await prewarm_scheduler.stop()
 
-app = FastAPI(title="W-proj8 API", version="2.0")
+app = FastAPI(title="W-proj8 API", version="2.0", lifespan=lifespan)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 # Pydantic models
@@ -43,6 +56,14 @@ class CaptureStrategyRequest(BaseModel):
     current_price: float
     holding_period_days: int = 60
 
+class FundamentalsRequest(BaseModel):
+    ticker: str = Field(pattern=TICKER_PATTERN)
+    dividend_yield: Optional[float] = None
+    payout_ratio: Optional[float] = None
+    earnings_growth: Optional[float] = None
+    debt_to_equity: Optional[float] = None
+    free_cash_flow_trend: Optional[float] = None
+
 # Define API routes FIRST before mounting static files
 
 
@@ -50,7 +71,7 @@ class CaptureStrategyRequest(BaseModel):
 @app.post("/api/auth/register")
 async def register(request: LoginRequest):
     """Register a new user"""
-    logger.info(f"POST /api/auth/register - {request.email}")
+    logger.info("POST /api/auth/register - %s", request.email, extra={"route": "/api/auth/register"})
     if request.email in USERS_DB:
         raise HTTPException(status_code=400, detail="User already exists")
     
@@ -72,7 +93,7 @@ async def register(request: LoginRequest):
 @app.post("/api/auth/login")
 async def login(request: LoginRequest):
     """Login user"""
-    logger.info(f"POST /api/auth/login - {request.email}")
+    logger.info("POST /api/auth/login - %s", request.email, extra={"route": "/api/auth/login"})
     if request.email not in USERS_DB:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -113,13 +134,13 @@ async def get_user(token: str = Query(None)):
 @app.get("/api/subscription/plans")
 async def get_subscription_plans():
     """Get all available subscription plans"""
-    logger.info("GET /api/subscription/plans")
+    logger.info("GET /api/subscription/plans", extra={"route": "/api/subscription/plans"})
     return {"plans": SUBSCRIPTION_TIERS}
 
 @app.post("/api/subscription/upgrade")
 async def upgrade_subscription(tier: str, token: str = Query(None)):
     """Upgrade user subscription"""
-    logger.info(f"POST /api/subscription/upgrade - {tier}")
+    logger.info("POST /api/subscription/upgrade - %s", tier, extra={"route": "/api/subscription/upgrade"})
     if not token:
         raise HTTPException(status_code=401, detail="No token provided")
     
@@ -139,7 +160,7 @@ async def upgrade_subscription(tier: str, token: str = Query(None)):
 @app.post("/api/dividend/safety-score")
 async def dividend_safety(request: DividendSafetyRequest, token: str = Query(None)):
     """Calculate dividend safety score for a ticker"""
-    logger.info(f"POST /api/dividend/safety-score - {request.ticker}")
+    logger.info("POST /api/dividend/safety-score - %s", request.ticker, extra={"route": "/api/dividend/safety-score", "ticker": request.ticker})
     if token:
         payload = verify_token(token)
         user = USERS_DB.get(payload.get("email"))
@@ -156,7 +177,7 @@ async def dividend_safety(request: DividendSafetyRequest, token: str = Query(Non
 @app.post("/api/dividend/capture-strategy")
 async def capture_strategy(request: CaptureStrategyRequest, token: str = Query(None)):
     """Analyze dividend capture strategy"""
-    logger.info(f"POST /api/dividend/capture-strategy - {request.ticker}")
+    logger.info("POST /api/dividend/capture-strategy - %s", request.ticker, extra={"route": "/api/dividend/capture-strategy", "ticker": request.ticker})
     if token:
         payload = verify_token(token)
         user = USERS_DB.get(payload.get("email"))
@@ -175,7 +196,7 @@ async def capture_strategy(request: CaptureStrategyRequest, token: str = Query(N
 @app.post("/api/payment/crypto")
 async def process_crypto_payment(crypto_type: str, amount: float, token: str = Query(None)):
     """Process cryptocurrency payment"""
-    logger.info(f"POST /api/payment/crypto - {crypto_type} {amount}")
+    logger.info("POST /api/payment/crypto - %s %s", crypto_type, amount, extra={"route": "/api/payment/crypto"})
     if not token:
         raise HTTPException(status_code=401, detail="No token provided")
     
@@ -198,10 +219,68 @@ async def process_crypto_payment(crypto_type: str, amount: float, token: str = Q
         "wallet_address": "1A1z7agoat3ws..."  # Mock address
     }
 
+@app.get("/api/screener", response_class=FastJSONResponse)
+async def screener(
+    min_yield: Optional[float] = Query(None, ge=0),
+    max_yield: Optional[float] = Query(None, ge=0),
+    max_payout_ratio: Optional[float] = Query(None),
+    min_earnings_growth: Optional[float] = Query(None),
+    max_debt_to_equity: Optional[float] = Query(None, ge=0),
+    min_grade: Optional[str] = Query(None, pattern="^[A-Fa-f]$"),
+    sort: str = Query("yield"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    token: str = Query(None),
+):
+    """Filter, sort and paginate precomputed dividend safety scores"""
+    logger.info("GET /api/screener", extra={"route": "/api/screener"})
+    if token:
+        payload = verify_token(token)
+        user = USERS_DB.get(payload.get("email"))
+        if user and user["subscription"] == "free":
+            raise HTTPException(status_code=403, detail="Premium feature required")
+    if sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort field, expected one of {sorted(SORT_FIELDS)}")
+
+    result = screener_index.query(
+        min_yield=min_yield,
+        max_yield=max_yield,
+        max_payout_ratio=max_payout_ratio,
+        min_earnings_growth=min_earnings_growth,
+        max_debt_to_equity=max_debt_to_equity,
+        min_grade=min_grade,
+        sort=sort,
+        descending=order == "desc",
+        offset=offset,
+        limit=limit,
+    )
+    return FastJSONResponse(result)
+
+@app.post("/api/screener/fundamentals")
+async def screener_fundamentals(items: List[FundamentalsRequest], x_admin_key: str = Header(None)):
+    """Upsert fundamentals for one or more tickers (service credential required); only changed tickers are re-scored"""
+    logger.info("POST /api/screener/fundamentals - %d tickers", len(items), extra={"route": "/api/screener/fundamentals"})
+    # The screener table is shared by all users, so writes need the service key rather than a user token
+    if not SCREENER_ADMIN_KEY:
+        raise HTTPException(status_code=403, detail="Screener writes are disabled")
+    if not x_admin_key:
+        raise HTTPException(status_code=401, detail="No admin key provided")
+    if not hmac.compare_digest(x_admin_key, SCREENER_ADMIN_KEY):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    if len(items) > SCREENER_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {SCREENER_MAX_BATCH} tickers per request")
+
+    try:
+        rescored = screener_index.upsert_many([item.model_dump() for item in items])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"received": len(items), "rescored": rescored, "universe_size": len(screener_index)}
+
 @app.get("/api/portfolio/analytics")
 async def portfolio_analytics(token: str = Query(None)):
     """Get advanced portfolio analytics"""
-    logger.info("GET /api/portfolio/analytics")
+    logger.info("GET /api/portfolio/analytics", extra={"route": "/api/portfolio/analytics"})
     if token:
         payload = verify_token(token)
         user = USERS_DB.get(payload.get("email"))
@@ -218,36 +297,45 @@ async def portfolio_analytics(token: str = Query(None)):
     return analytics
 
 
-@app.get("/api/price/{ticker}")
+# Data endpoints return FastJSONResponse directly so FastAPI skips jsonable_encoder
+@app.get("/api/price/{ticker}", response_class=FastJSONResponse)
 async def api_price(ticker: str):
-    logger.info(f"GET /api/price/{ticker}")
+    logger.info("GET /api/price/%s", ticker, extra={"route": "/api/price", "ticker": ticker})
     result = DataProvider.get_price(ticker)
     if "error" in result:
-        logger.warning(f"Price fetch failed for {ticker}: {result['error']}")
-    return result
+        logger.warning("Price fetch failed for %s: %s", ticker, result["error"], extra={"route": "/api/price", "ticker": ticker})
+    else:
+        hot_tickers.record("price", ticker)
+    return FastJSONResponse(result)
 
 
-@app.get("/api/historical/{ticker}")
-async def api_historical(ticker: str, days: int = Query(30, ge=1, le=3650)):
-    logger.info(f"GET /api/historical/{ticker}?days={days}")
+@app.get("/api/historical/{ticker}", response_class=FastJSONResponse)
+async def api_historical(ticker: str, days: int = Query(30, ge=1, le=3650), stream: bool = Query(False)):
+    logger.info("GET /api/historical/%s?days=%d", ticker, days, extra={"route": "/api/historical", "ticker": ticker})
     result = DataProvider.get_historical(ticker, days)
     if "error" in result:
-        logger.warning(f"Historical fetch failed for {ticker}: {result['error']}")
-    return result
+        logger.warning("Historical fetch failed for %s: %s", ticker, result["error"], extra={"route": "/api/historical", "ticker": ticker})
+    else:
+        hot_tickers.record("historical", ticker, days)
+    if stream:
+        return StreamingJSONResponse(result, array_key="data")
+    return FastJSONResponse(result)
 
 
-@app.get("/api/dividends/{ticker}")
+@app.get("/api/dividends/{ticker}", response_class=FastJSONResponse)
 async def api_dividends(ticker: str, limit: int = Query(10, ge=1, le=50)):
-    logger.info(f"GET /api/dividends/{ticker}?limit={limit}")
+    logger.info("GET /api/dividends/%s?limit=%d", ticker, limit, extra={"route": "/api/dividends", "ticker": ticker})
     result = DataProvider.get_dividends(ticker, limit)
     if "error" in result:
-        logger.warning(f"Dividends fetch failed for {ticker}: {result['error']}")
-    return result
+        logger.warning("Dividends fetch failed for %s: %s", ticker, result["error"], extra={"route": "/api/dividends", "ticker": ticker})
+    else:
+        hot_tickers.record("dividends", ticker, limit)
+    return FastJSONResponse(result)
 
 
 @app.get("/health")
 async def health():
-    logger.info("Health check")
+    logger.info("Health check", extra={"route": "/health"})
     return {"status": "healthy", "provider": CURRENT_PROVIDER, "caching": CACHING_ENABLED}
 
 
@@ -260,12 +348,12 @@ async def docs():
 frontend_dist = pathlib.Path(__file__).resolve().parent.parent / "frontend" / "dist"
 if frontend_dist.exists():
     app.mount("/", StaticFiles(directory=str(frontend_dist), html=True), name="frontend")
-    logger.info(f"Serving frontend from {frontend_dist}")
+    logger.info("Serving frontend from %s", frontend_dist)
 else:
     @app.get("/")
     async def root():
         return {"message": "Frontend not built. Run `npm --prefix frontend run build` to create `frontend/dist`."}
-    logger.warning(f"Frontend not found at {frontend_dist}. Run 'npm --prefix frontend run build' to enable frontend serving.")
+    logger.warning("Frontend not found at %s. Run 'npm --prefix frontend run build' to enable frontend serving.", frontend_dist)
 
 
 if __name__ == "__main__":
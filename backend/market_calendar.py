@@ -0,0 +1,99 @@
+import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = datetime.time(9, 30)
+MARKET_CLOSE = datetime.time(16, 0)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th `weekday` (Mon=0) of the month; n=-1 for the last one."""
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = datetime.date(year, month + 1, 1) - datetime.timedelta(days=1) if month < 12 else datetime.date(year, 12, 31)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    # Anonymous Gregorian algorithm
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _observed(day):
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=16)
+def nyse_holidays(year: int) -> frozenset:
+    """Full-day NYSE closures for `year` (early-close days are treated as normal sessions)."""
+    days = {
+        _nth_weekday(year, 1, 0, 3),                        # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                        # Washington's Birthday
+        _easter(year) - datetime.timedelta(days=2),         # Good Friday
+        _nth_weekday(year, 5, 0, -1),                       # Memorial Day
+        _observed(datetime.date(year, 7, 4)),               # Independence Day
+        _nth_weekday(year, 9, 0, 1),                        # Labor Day
+        _nth_weekday(year, 11, 3, 4),                       # Thanksgiving
+        _observed(datetime.date(year, 12, 25)),             # Christmas
+    }
+    # New Year's Day falling on Saturday is not observed on the prior Friday
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(datetime.date(year, 6, 19)))     # Juneteenth
+    return frozenset(days)
+
+
+def is_trading_day(day: datetime.date) -> bool:
+    return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+
+def _session_times(day):
+    return (
+        datetime.datetime.combine(day, MARKET_OPEN, tzinfo=MARKET_TZ),
+        datetime.datetime.combine(day, MARKET_CLOSE, tzinfo=MARKET_TZ),
+    )
+
+
+def next_session_change(now: datetime.datetime) -> datetime.datetime:
+    """Next market open or close strictly after `now` (aware datetime)."""
+    day = now.astimezone(MARKET_TZ).date()
+    while True:
+        if is_trading_day(day):
+            for boundary in _session_times(day):
+                if boundary > now:
+                    return boundary
+        day += datetime.timedelta(days=1)
+
+
+def next_prewarm(now: datetime.datetime, pre_open_minutes: int = 15, post_close_minutes: int = 15):
+    """Return (when, label) for the next pre-open or post-close pre-warm slot after `now`."""
+    day = now.astimezone(MARKET_TZ).date()
+    while True:
+        if is_trading_day(day):
+            open_at, close_at = _session_times(day)
+            slots = [
+                (open_at - datetime.timedelta(minutes=pre_open_minutes), "pre_open"),
+                (close_at + datetime.timedelta(minutes=post_close_minutes), "post_close"),
+            ]
+            for when, label in slots:
+                if when > now:
+                    return when, label
+        day += datetime.timedelta(days=1)
@@ -0,0 +1,260 @@
+import os
+import re
+import json
+import asyncio
+import threading
+import logging
+import functools
+import datetime
+from collections import Counter
+
+import cache
+from data_provider import DataProvider
+from market_calendar import next_prewarm, next_session_change
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "true").lower() in ("1", "true", "yes")
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "50"))
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))
+PREWARM_PRE_OPEN_MINUTES = int(os.getenv("PREWARM_PRE_OPEN_MINUTES", "15"))
+PREWARM_POST_CLOSE_MINUTES = int(os.getenv("PREWARM_POST_CLOSE_MINUTES", "15"))
+# How often workers push hit counts to Redis and the leader renews its lock
+PREWARM_TICK_SECONDS = int(os.getenv("PREWARM_TICK_SECONDS", "30"))
+# Hit counters kept per day, as a multiple of PREWARM_TOP_N (Space-Saving capacity)
+PREWARM_TRACKED_FACTOR = int(os.getenv("PREWARM_TRACKED_FACTOR", "4"))
+
+HITS_KEY = "prewarm:hits:{day}"
+LEADER_KEY = "prewarm:leader"
+
+logger = logging.getLogger(__name__)
+
+# kind -> DataProvider method; the optional param (days / limit) is passed positionally like the handlers do
+_FETCHERS = {
+    "price": "get_price",
+    "historical": "get_historical",
+    "dividends": "get_dividends",
+}
+
+
+_TICKER_RE = re.compile(r"[A-Za-z0-9.^=-]{1,15}")
+
+# Space-Saving merge of a batch of (member, hits) into a capped sorted set: a new
+# member that doesn't fit replaces the lowest one and inherits its count.
+_SPACE_SAVING_LUA = """
+local key, capacity, expire = KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2])
+for i = 3, #ARGV, 2 do
+  local member, hits = ARGV[i], tonumber(ARGV[i + 1])
+  if redis.call('ZSCORE', key, member) or redis.call('ZCARD', key) < capacity then
+    redis.call('ZINCRBY', key, hits, member)
+  else
+    local lowest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    redis.call('ZREM', key, lowest[1])
+    redis.call('ZADD', key, tonumber(lowest[2]) + hits, member)
+  end
+end
+redis.call('EXPIRE', key, expire)
+"""
+
+
+def _space_saving_add(counts: Counter, entry, hits: int, capacity: int):
+    """Add `hits` to `entry`, evicting the lowest counter (whose count `entry` inherits) when full.
+
+    Counts become upper bounds, but any key whose true count exceeds
+    total/capacity is guaranteed to be kept, so late risers still get in.
+    """
+    if entry in counts or len(counts) < capacity:
+        counts[entry] += hits
+        return
+    lowest = min(counts, key=counts.__getitem__)
+    counts[entry] = counts.pop(lowest) + hits
+
+
+def _today():
+    return datetime.date.today().isoformat()
+
+
+class HotTickerTracker:
+    """Counts (kind, ticker, param) requests so the most popular ones can be pre-warmed.
+
+    `record()` only touches a local Counter; `flush()` periodically merges the
+    counts into a per-day Redis sorted set so every worker contributes to the
+    ranking. Without Redis the local counts are used directly. Pending and
+    per-day counts are Space-Saving summaries of at most `max_entries`
+    counters, so arbitrary client tickers can't grow them.
+    """
+
+    def __init__(self, redis_client=None, days_kept: int = 2, max_entries: int = PREWARM_TOP_N * PREWARM_TRACKED_FACTOR):
+        self.redis = redis_client
+        self.days_kept = days_kept
+        self.max_entries = max_entries
+        self._pending = Counter()
+        self._pending_lock = threading.Lock()
+        self._local = {}
+        self._merge_script = redis_client.register_script(_SPACE_SAVING_LUA) if redis_client is not None else None
+
+    def record(self, kind: str, ticker: str, param=None):
+        # ticker is kept verbatim so warmed entries hit the same cache keys as the handlers
+        if kind not in _FETCHERS or not _TICKER_RE.fullmatch(ticker):
+            return
+        with self._pending_lock:
+            _space_saving_add(self._pending, (kind, ticker, param), 1, self.max_entries)
+
+    def flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+        day = _today()
+        if self.redis is not None:
+            args = [self.max_entries, 86400 * (self.days_kept + 1)]
+            for entry, hits in pending.items():
+                args += [json.dumps(entry), hits]
+            self._merge_script(keys=[HITS_KEY.format(day=day)], args=args)
+        else:
+            counts = self._local.setdefault(day, Counter())
+            for entry, hits in pending.items():
+                _space_saving_add(counts, entry, hits, self.max_entries)
+            for stale in sorted(self._local)[:-self.days_kept]:
+                del self._local[stale]
+
+    def top(self, n: int):
+        """Most-requested (kind, ticker, param) entries over the last `days_kept` days."""
+        totals = Counter()
+        if self.redis is not None:
+            today = datetime.date.today()
+            for offset in range(self.days_kept):
+                key = HITS_KEY.format(day=(today - datetime.timedelta(days=offset)).isoformat())
+                for member, hits in self.redis.zrevrange(key, 0, n * 3, withscores=True):
+                    try:
+                        kind, ticker, param = json.loads(member)
+                    except (ValueError, TypeError):
+                        continue
+                    totals[(kind, ticker, param)] += hits
+        else:
+            for counts in self._local.values():
+                totals.update(counts)
+        return [entry for entry, _ in totals.most_common(n)]
+
+
+class PrewarmScheduler:
+    """Refreshes the hottest tickers into the cache shortly before the open and after the close.
+
+    With Redis, only the worker holding the `prewarm:leader` lock runs warm
+    cycles; the lock expires if that worker dies and another one takes over.
+    Fetches run in worker threads behind a semaphore so a cycle never holds
+    more than `concurrency` provider calls at once.
+    """
+
+    def __init__(self, tracker: HotTickerTracker, redis_client=None, top_n: int = PREWARM_TOP_N,
+                 concurrency: int = PREWARM_CONCURRENCY, tick_seconds: int = PREWARM_TICK_SECONDS):
+        self.tracker = tracker
+        self.redis = redis_client
+        self.top_n = top_n
+        self.concurrency = concurrency
+        self.tick_seconds = tick_seconds
+        self._lock = None
+        self._task = None
+
+    def is_leader(self) -> bool:
+        if self.redis is None:
+            return True
+        try:
+            if self._lock is None:
+                self._lock = self.redis.lock(LEADER_KEY, timeout=self.tick_seconds * 3, thread_local=False)
+            if self._lock.owned():
+                self._lock.reacquire()
+                return True
+            return self._lock.acquire(blocking=False)
+        except Exception:
+            logger.warning("Pre-warm leader election failed", exc_info=True)
+            return False
+
+    async def warm(self, cache_ttl: int = None):
+        """Refresh the current top entries; returns the number of successful refreshes."""
+        # Redis calls run in worker threads so a slow Redis never blocks the event loop
+        try:
+            await asyncio.to_thread(self.tracker.flush)
+        except Exception:
+            logger.warning("Pre-warm hit count flush failed", exc_info=True)
+        entries = await asyncio.to_thread(self.tracker.top, self.top_n)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(kind, ticker, param):
+            fetch = getattr(DataProvider, _FETCHERS[kind])
+            args = (ticker,) if param is None else (ticker, param)
+            if hasattr(fetch, "refresh"):
+                call = functools.partial(fetch.refresh, *args, cache_ttl=cache_ttl)
+            else:
+                call = functools.partial(fetch, *args)
+            async with semaphore:
+                try:
+                    result = await asyncio.to_thread(call)
+                except Exception:
+                    logger.warning("Pre-warm of %s %s failed", kind, ticker, exc_info=True)
+                    return False
+            return "error" not in result
+
+        # A cycle can outlast the leader lock's timeout; keep renewing it so no other worker starts a duplicate
+        renewer = asyncio.create_task(self._renew_leadership()) if self.redis is not None else None
+        try:
+            results = await asyncio.gather(*(refresh(*entry) for entry in entries if entry[0] in _FETCHERS))
+        finally:
+            if renewer is not None:
+                renewer.cancel()
+        return sum(results)
+
+    async def _renew_leadership(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            if not await asyncio.to_thread(self.is_leader):
+                logger.warning("Pre-warm leader lock lost during a warm cycle")
+
+    async def run(self):
+        while True:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            due, label = next_prewarm(now, PREWARM_PRE_OPEN_MINUTES, PREWARM_POST_CLOSE_MINUTES)
+            while now < due:
+                await asyncio.sleep(min(self.tick_seconds, (due - now).total_seconds()))
+                try:
+                    await asyncio.to_thread(self.tracker.flush)
+                except Exception:
+                    logger.warning("Pre-warm hit count flush failed", exc_info=True)
+                await asyncio.to_thread(self.is_leader)
+                now = datetime.datetime.now(datetime.timezone.utc)
+            try:
+                if await asyncio.to_thread(self.is_leader):
+                    # Keep warmed entries past the next open/close (plus their normal TTL) so the
+                    # first requests after it are still served from cache
+                    ttl = int((next_session_change(now) - now).total_seconds())
+                    started = datetime.datetime.now(datetime.timezone.utc)
+                    warmed = await self.warm(cache_ttl=ttl)
+                    logger.info("Pre-warm %s: refreshed %d entries in %.1fs", label, warmed,
+                                (datetime.datetime.now(datetime.timezone.utc) - started).total_seconds())
+            except Exception:
+                logger.exception("Pre-warm %s cycle failed", label)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lock is not None and self.redis is not None:
+            await asyncio.to_thread(self._release)
+
+    def _release(self):
+        try:
+            if self._lock.owned():
+                self._lock.release()
+        except Exception:
+            pass
+
+
+tracker = HotTickerTracker(cache._redis)
+scheduler = PrewarmScheduler(tracker, cache._redis)
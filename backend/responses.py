@@ -0,0 +1,55 @@
+import json
+
+from fastapi.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_ENABLED = orjson is not None
+
+STREAM_CHUNK_SIZE = 500
+
+
+def dumps(content) -> bytes:
+    """Encode plain Python data to compact JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=str)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (stdlib json fallback).
+
+    Return an instance directly from a handler so FastAPI skips its
+    `jsonable_encoder` pass; the content must already be plain dicts, lists,
+    strings and numbers, as DataProvider and the analytics helpers produce.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def _iter_json(payload: dict, array_key: str, chunk_size: int):
+    rows = payload.get(array_key) or []
+    head = {k: v for k, v in payload.items() if k != array_key}
+    # '{"error":"...",' + '"data":[' ... ']}'
+    prefix = dumps(head)[:-1]
+    if head:
+        prefix += b","
+    yield prefix + dumps(array_key) + b":["
+    for start in range(0, len(rows), chunk_size):
+        chunk = dumps(rows[start:start + chunk_size])[1:-1]
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """Stream `payload[array_key]` in chunks of `chunk_size` items instead of buffering the whole body."""
+
+    media_type = "application/json"
+
+    def __init__(self, payload: dict, array_key: str = "data", chunk_size: int = STREAM_CHUNK_SIZE, **kwargs):
+        kwargs.setdefault("media_type", self.media_type)
+        super().__init__(_iter_json(payload, array_key, chunk_size), **kwargs)
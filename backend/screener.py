@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import math
+import bisect
+import logging
+from typing import Dict, List, Optional
+
+from analytics import calculate_dividend_safety_score
+
+SCREENER_DATA = os.getenv("SCREENER_DATA")
+# Service credential required to write fundamentals; writes are disabled when unset
+SCREENER_ADMIN_KEY = os.getenv("SCREENER_ADMIN_KEY")
+SCREENER_MAX_BATCH = int(os.getenv("SCREENER_MAX_BATCH", "1000"))
+
+TICKER_PATTERN = r"^[A-Za-z0-9.^=-]{1,15}$"
+_TICKER_RE = re.compile(TICKER_PATTERN)
+
+logger = logging.getLogger(__name__)
+
+# Inputs to calculate_dividend_safety_score, plus the yield the screener filters on
+INPUT_FIELDS = ("dividend_yield", "payout_ratio", "earnings_growth", "debt_to_equity", "free_cash_flow_trend")
+INPUT_DEFAULTS = {"earnings_growth": 5.0, "debt_to_equity": 0.5, "free_cash_flow_trend": 1.0}
+
+# Public sort names -> row field; every field here has a sorted index
+SORT_FIELDS = {
+    "yield": "dividend_yield",
+    "score": "score",
+    "payout_ratio": "payout_ratio",
+    "earnings_growth": "earnings_growth",
+    "debt_to_equity": "debt_to_equity",
+}
+
+GRADE_MIN_SCORE = {"A": 90, "B": 80, "C": 70, "D": 60, "F": 0}
+
+
+class ScreenerIndex:
+    """In-memory fundamentals table with precomputed safety scores and sorted indexes.
+
+    Each indexed field keeps a list of (value, ticker) tuples in ascending
+    order, so range filters are two bisects and sorted pages are slices.
+    `upsert()` re-scores only the ticker whose inputs changed and moves its
+    entries within each index.
+    """
+
+    def __init__(self):
+        self.rows: Dict[str, Dict] = {}
+        self.indexes: Dict[str, List] = {field: [] for field in SORT_FIELDS.values()}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _unindex(self, row):
+        for field, index in self.indexes.items():
+            entry = (row[field], row["ticker"])
+            i = bisect.bisect_left(index, entry)
+            if i < len(index) and index[i] == entry:
+                del index[i]
+
+    def _index(self, row):
+        for field, index in self.indexes.items():
+            bisect.insort(index, (row[field], row["ticker"]))
+
+    def _inputs(self, ticker, fundamentals):
+        old = self.rows.get(ticker)
+        inputs = {}
+        for field in INPUT_FIELDS:
+            value = fundamentals.get(field)
+            if value is None:
+                value = old[field] if old else INPUT_DEFAULTS.get(field)
+            if value is None:
+                raise ValueError(f"{ticker}: missing {field}")
+            value = float(value)
+            # NaN/inf would break bisect ordering and index removal
+            if not math.isfinite(value):
+                raise ValueError(f"{ticker}: {field} must be a finite number")
+            inputs[field] = value
+        return inputs
+
+    def _apply(self, ticker, inputs):
+        old = self.rows.get(ticker)
+        if old and all(old[f] == inputs[f] for f in INPUT_FIELDS):
+            return False
+        safety = calculate_dividend_safety_score(
+            payout_ratio=inputs["payout_ratio"],
+            earnings_growth=inputs["earnings_growth"],
+            debt_to_equity=inputs["debt_to_equity"],
+            free_cash_flow_trend=inputs["free_cash_flow_trend"],
+        )
+        row = {"ticker": ticker, **inputs, **safety}
+        if old:
+            self._unindex(old)
+        self.rows[ticker] = row
+        self._index(row)
+        return True
+
+    def upsert(self, ticker: str, **fundamentals) -> bool:
+        """Insert or update one ticker; returns False when its inputs are unchanged (no re-score).
+
+        Omitted fields keep their current value, or a default for new tickers;
+        `dividend_yield` and `payout_ratio` are required for new tickers.
+        """
+        if not _TICKER_RE.fullmatch(ticker):
+            raise ValueError(f"Invalid ticker: {ticker!r}")
+        ticker = ticker.upper()
+        return self._apply(ticker, self._inputs(ticker, fundamentals))
+
+    def upsert_many(self, items: List[Dict]) -> int:
+        """Upsert a batch of {"ticker": ..., **fundamentals}; returns how many tickers were re-scored.
+
+        Items for the same ticker are merged in order (later non-null fields
+        win), and all tickers are validated before any is applied, so a bad
+        item leaves the index untouched.
+        """
+        merged = {}
+        for item in items:
+            ticker = item.get("ticker")
+            if not isinstance(ticker, str) or not _TICKER_RE.fullmatch(ticker):
+                raise ValueError(f"Invalid ticker: {ticker!r}")
+            fields = merged.setdefault(ticker.upper(), {})
+            fields.update({k: v for k, v in item.items() if k != "ticker" and v is not None})
+        staged = [(ticker, self._inputs(ticker, fields)) for ticker, fields in merged.items()]
+        return sum(self._apply(ticker, inputs) for ticker, inputs in staged)
+
+    def remove(self, ticker: str) -> bool:
+        row = self.rows.pop(ticker.upper(), None)
+        if row is None:
+            return False
+        self._unindex(row)
+        return True
+
+    def _range(self, field, low=None, high=None):
+        """Slice of the `field` index with low <= value <= high."""
+        index = self.indexes[field]
+        start = 0 if low is None else bisect.bisect_left(index, (low,))
+        end = len(index) if high is None else bisect.bisect_right(index, (high, chr(0x10FFFF)))
+        return index[start:end]
+
+    def query(
+        self,
+        min_yield: Optional[float] = None,
+        max_yield: Optional[float] = None,
+        max_payout_ratio: Optional[float] = None,
+        min_earnings_growth: Optional[float] = None,
+        max_debt_to_equity: Optional[float] = None,
+        min_grade: Optional[str] = None,
+        sort: str = "yield",
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Dict:
+        """Filter, sort and paginate the universe.
+
+        The most selective range filter (by bisected slice size) drives the
+        scan; remaining filters are checked per row. Without filters the page
+        is sliced straight out of the sort index.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {sort}")
+        sort_field = SORT_FIELDS[sort]
+
+        bounds = {}
+        if min_yield is not None or max_yield is not None:
+            bounds["dividend_yield"] = (min_yield, max_yield)
+        if max_payout_ratio is not None:
+            bounds["payout_ratio"] = (None, max_payout_ratio)
+        if min_earnings_growth is not None:
+            bounds["earnings_growth"] = (min_earnings_growth, None)
+        if max_debt_to_equity is not None:
+            bounds["debt_to_equity"] = (None, max_debt_to_equity)
+        if min_grade is not None:
+            grade = min_grade.upper()
+            if grade not in GRADE_MIN_SCORE:
+                raise ValueError(f"Invalid grade: {min_grade}")
+            bounds["score"] = (GRADE_MIN_SCORE[grade], None)
+
+        if not bounds:
+            index = self.indexes[sort_field]
+            total = len(index)
+            if descending:
+                entries = index[max(0, total - offset - limit):max(0, total - offset)][::-1]
+            else:
+                entries = index[offset:offset + limit]
+            page = [self.rows[ticker] for _, ticker in entries]
+            return {"total": total, "offset": offset, "limit": limit, "results": page}
+
+        slices = {field: self._range(field, *bound) for field, bound in bounds.items()}
+        driver = min(slices, key=lambda field: len(slices[field]))
+        rest = [(field, low, high) for field, (low, high) in bounds.items() if field != driver]
+
+        matches = []
+        for _, ticker in slices[driver]:
+            row = self.rows[ticker]
+            if all((low is None or row[f] >= low) and (high is None or row[f] <= high) for f, low, high in rest):
+                matches.append(row)
+
+        if sort_field == driver:
+            # Driver slice is already in sort order and filtering keeps it
+            if descending:
+                matches.reverse()
+        else:
+            matches.sort(key=lambda row: (row[sort_field], row["ticker"]), reverse=descending)
+        return {"total": len(matches), "offset": offset, "limit": limit, "results": matches[offset:offset + limit]}
+
+
+def load_universe(index: ScreenerIndex, path: str) -> int:
+    """Seed `index` from a JSON list of {"ticker": ..., "dividend_yield": ..., ...} objects."""
+    with open(path) as f:
+        items = json.load(f)
+    return index.upsert_many(items)
+
+
+screener_index = ScreenerIndex()
+
+if SCREENER_DATA:
+    try:
+        count = load_universe(screener_index, SCREENER_DATA)
+        logger.info("Loaded %d screener tickers from %s", count, SCREENER_DATA)
+    except Exception:
+        logger.warning("Failed to load screener universe from %s", SCREENER_DATA, exc_info=True)
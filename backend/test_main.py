@@ -1,9 +1,42 @@
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import pathlib
+import subprocess
+import logging
+import datetime
 import pytest
 from fastapi.testclient import TestClient
+import main
 from main import app
+from logging_config import JsonFormatter, RouteSampler, parse_sample_rates
+from responses import FastJSONResponse, StreamingJSONResponse
+from data_provider import DataProvider
+from cache import cache_result
+from market_calendar import is_trading_day, next_prewarm, MARKET_TZ
+from prewarm import HotTickerTracker, PrewarmScheduler
+from screener import ScreenerIndex, screener_index
+from auth import create_access_token
 
 client = TestClient(app)
 
+BACKEND_DIR = pathlib.Path(__file__).resolve().parent
+
+
+def import_main_with_dotenv(tmp_path, env_lines, expression):
+    """Import a copy of the backend with `env_lines` in its .env and return `expression` evaluated after import."""
+    for source in BACKEND_DIR.glob("*.py"):
+        shutil.copy(source, tmp_path / source.name)
+    (tmp_path / ".env").write_text("\n".join(env_lines) + "\n")
+    env = {k: v for k, v in os.environ.items() if k not in {line.split("=")[0] for line in env_lines}}
+    env["PREWARM_ENABLED"] = "false"
+    code = f"import main, logging, prewarm, data_provider, cache; print({expression})"
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    return out.stdout.strip().splitlines()[-1]
+
 
 class TestHealthEndpoint:
     def test_health_returns_200(self):
@@ -106,3 +139,364 @@ class TestDocsEndpoint:
     def test_docs_returns_200(self):
         response = client.get("/docs")
         assert response.status_code == 200
+
+
+class TestLogging:
+    def _record(self, level=logging.INFO, **extra):
+        record = logging.LogRecord("main", level, __file__, 1, "GET /api/price/%s", ("AAPL",), None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_parse_sample_rates(self):
+        rates = parse_sample_rates("/api/price=0.05, /api/historical=2,bad,/x=nan?")
+        assert rates == {"/api/price": 0.05, "/api/historical": 1.0}
+
+    def test_json_formatter_includes_extra_fields(self):
+        line = JsonFormatter().format(self._record(route="/api/price", ticker="AAPL"))
+        entry = json.loads(line)
+        assert entry["msg"] == "GET /api/price/AAPL"
+        assert entry["level"] == "INFO"
+        assert entry["route"] == "/api/price"
+        assert entry["ticker"] == "AAPL"
+
+    def test_route_sampler_drops_sampled_info(self):
+        sampler = RouteSampler({"/api/price": 0.0})
+        assert not sampler.filter(self._record(route="/api/price"))
+        assert sampler.filter(self._record(route="/health"))
+        assert sampler.filter(self._record())
+
+    def test_dotenv_log_level_applies(self, tmp_path):
+        level = import_main_with_dotenv(tmp_path, ["LOG_LEVEL=WARNING"], "logging.getLogger().level")
+        assert level == str(logging.WARNING)
+
+    def test_route_sampler_keeps_warnings(self):
+        sampler = RouteSampler({"/api/price": 0.0})
+        assert sampler.filter(self._record(level=logging.WARNING, route="/api/price"))
+
+
+class TestFastJSON:
+    PAYLOAD = {"data": [{"date": f"2025-01-{d:02d}T00:00:00", "Close": 100.5 + d, "Volume": d} for d in range(1, 12)]}
+
+    def test_fast_json_matches_stdlib(self):
+        body = FastJSONResponse(self.PAYLOAD).body
+        assert json.loads(body) == self.PAYLOAD
+
+    def test_streaming_json_is_valid(self):
+        async def collect(response):
+            return b"".join([chunk async for chunk in response.body_iterator])
+
+        for payload in (self.PAYLOAD, {"data": []}, {"error": "boom", "data": self.PAYLOAD["data"][:3]}):
+            body = asyncio.run(collect(StreamingJSONResponse(payload, chunk_size=4)))
+            assert json.loads(body) == payload
+
+    def test_historical_stream_matches_buffered(self, monkeypatch):
+        monkeypatch.setattr(DataProvider, "get_historical", staticmethod(lambda ticker, days=30: self.PAYLOAD))
+        buffered = client.get("/api/historical/AAPL?days=11")
+        streamed = client.get("/api/historical/AAPL?days=11&stream=true")
+        assert buffered.status_code == streamed.status_code == 200
+        assert streamed.headers["content-type"].startswith("application/json")
+        assert buffered.json() == streamed.json() == self.PAYLOAD
+
+
+class TestCacheRefresh:
+    def test_refresh_overwrites_cached_value(self):
+        calls = []
+
+        @cache_result(ttl=60)
+        def fetch(ticker):
+            calls.append(ticker)
+            return {"ticker": ticker, "n": len(calls)}
+
+        assert fetch("REFRESH_T")["n"] == 1
+        assert fetch("REFRESH_T")["n"] == 1
+        assert fetch.refresh("REFRESH_T", cache_ttl=600)["n"] == 2
+        assert fetch("REFRESH_T")["n"] == 2
+
+    def test_memory_cache_is_bounded(self, monkeypatch):
+        import cache
+        monkeypatch.setattr(cache, "_redis", None)
+        monkeypatch.setattr(cache, "MEM_CACHE_MAX_ENTRIES", 2)
+
+        @cache_result(ttl=60)
+        def fetch(ticker):
+            return {"ticker": ticker}
+
+        for ticker in ("LRU_A", "LRU_B", "LRU_A", "LRU_C"):
+            fetch(ticker)
+        keys = [key for key in cache._mem_cache if "LRU_" in key]
+        assert len(cache._mem_cache) <= 2
+        assert any("LRU_A" in key for key in keys) and any("LRU_C" in key for key in keys)
+
+    def test_refresh_extends_normal_ttl(self, monkeypatch):
+        import cache
+        monkeypatch.setattr(cache, "_redis", None)
+
+        @cache_result(ttl=60)
+        def fetch(ticker):
+            return {"ticker": ticker}
+
+        fetch.refresh("TTL_T", cache_ttl=900)
+        _, expire = next(v for k, v in cache._mem_cache.items() if "TTL_T" in k)
+        assert expire - time.time() > 900
+
+    def test_cache_if_skips_errors(self):
+        calls = []
+
+        @cache_result(ttl=60, cache_if=lambda r: "error" not in r)
+        def fetch(ticker):
+            calls.append(ticker)
+            return {"error": "boom"}
+
+        fetch("ERR_T")
+        fetch("ERR_T")
+        assert len(calls) == 2
+
+
+class TestMarketCalendar:
+    def test_holidays_and_weekends(self):
+        assert not is_trading_day(datetime.date(2025, 4, 18))   # Good Friday
+        assert not is_trading_day(datetime.date(2025, 11, 27))  # Thanksgiving
+        assert not is_trading_day(datetime.date(2025, 4, 19))   # Saturday
+        assert is_trading_day(datetime.date(2025, 4, 17))
+
+    def test_next_prewarm_skips_to_next_session(self):
+        # Thursday 17:00 ET before Good Friday -> Monday pre-open
+        now = datetime.datetime(2025, 4, 17, 17, 0, tzinfo=MARKET_TZ)
+        when, label = next_prewarm(now)
+        assert label == "pre_open"
+        assert when == datetime.datetime(2025, 4, 21, 9, 15, tzinfo=MARKET_TZ)
+
+    def test_next_prewarm_after_close(self):
+        now = datetime.datetime(2025, 4, 17, 12, 0, tzinfo=MARKET_TZ)
+        when, label = next_prewarm(now)
+        assert label == "post_close"
+        assert when == datetime.datetime(2025, 4, 17, 16, 15, tzinfo=MARKET_TZ)
+
+
+class TestPrewarm:
+    def test_tracker_ranks_most_requested(self):
+        tracker = HotTickerTracker()
+        for _ in range(3):
+            tracker.record("price", "MSFT")
+        tracker.record("historical", "AAPL", 30)
+        tracker.flush()
+        assert tracker.top(2) == [("price", "MSFT", None), ("historical", "AAPL", 30)]
+
+    def test_tracker_ignores_invalid_tickers(self):
+        tracker = HotTickerTracker()
+        tracker.record("price", "A|B")
+        tracker.record("price", "AAPL\n")
+        tracker.record("bogus", "AAPL")
+        tracker.record("price", "BRK.B")
+        tracker.flush()
+        assert tracker.top(5) == [("price", "BRK.B", None)]
+
+    def test_tracker_is_bounded(self):
+        tracker = HotTickerTracker(max_entries=3)
+        for days in range(1, 50):
+            tracker.record("historical", "AAPL", days)
+        for _ in range(40):
+            tracker.record("historical", "AAPL", 30)
+        tracker.flush()
+        tracker.record("historical", "KO", 7)
+        tracker.flush()
+        assert sum(len(counts) for counts in tracker._local.values()) == 3
+        assert tracker.top(1) == [("historical", "AAPL", 30)]
+
+    def test_tracker_admits_late_rising_ticker(self):
+        tracker = HotTickerTracker(max_entries=4)
+        for ticker in ("AAA", "BBB", "CCC", "DDD"):
+            for _ in range(20):
+                tracker.record("price", ticker)
+        tracker.flush()
+        for _ in range(50):
+            for _ in range(10):
+                tracker.record("price", "NEW")
+            tracker.flush()
+        assert tracker.top(4)[0] == ("price", "NEW", None)
+
+    def test_warm_renews_leader_lock(self, monkeypatch):
+        class FakeLock:
+            renewals = 0
+
+            def owned(self):
+                return True
+
+            def reacquire(self):
+                FakeLock.renewals += 1
+
+        class FakeRedis:
+            def lock(self, *args, **kwargs):
+                return FakeLock()
+
+        def slow_price(ticker):
+            time.sleep(0.2)
+            return {"ticker": ticker}
+
+        monkeypatch.setattr(DataProvider, "get_price", staticmethod(slow_price))
+        tracker = HotTickerTracker()
+        tracker.record("price", "AAPL")
+        scheduler = PrewarmScheduler(tracker, redis_client=FakeRedis(), tick_seconds=0.05)
+        assert asyncio.run(scheduler.warm()) == 1
+        assert FakeLock.renewals >= 2
+
+    def test_dotenv_settings_apply(self, tmp_path):
+        values = import_main_with_dotenv(
+            tmp_path,
+            ["PREWARM_TOP_N=7", "PRICE_TTL=5", "MEM_CACHE_MAX_ENTRIES=33"],
+            "prewarm.scheduler.top_n, data_provider.PRICE_TTL, cache.MEM_CACHE_MAX_ENTRIES",
+        )
+        assert values == "7 5 33"
+
+    def test_failed_cycle_does_not_stop_scheduler(self, monkeypatch):
+        class FailingTracker(HotTickerTracker):
+            def top(self, n):
+                raise ConnectionError("redis down")
+
+        scheduler = PrewarmScheduler(FailingTracker(), tick_seconds=0)
+        calls = []
+        past = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+        def fake_next_prewarm(now, *args):
+            calls.append(now)
+            if len(calls) > 2:
+                raise asyncio.CancelledError
+            return past, "pre_open"
+
+        monkeypatch.setattr("prewarm.next_prewarm", fake_next_prewarm)
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(scheduler.run())
+        assert len(calls) == 3
+
+    def test_warm_refreshes_top_entries(self, monkeypatch):
+        seen = []
+
+        def get_historical(ticker, days=30):
+            seen.append((ticker, days))
+            return {"data": []}
+
+        monkeypatch.setattr(DataProvider, "get_historical", staticmethod(get_historical))
+        tracker = HotTickerTracker()
+        tracker.record("historical", "AAPL", 60)
+        tracker.record("historical", "KO", 30)
+        warmed = asyncio.run(PrewarmScheduler(tracker, top_n=1, concurrency=1).warm())
+        assert warmed == 1
+        assert seen == [("AAPL", 60)]
+
+
+class TestScreener:
+    UNIVERSE = [
+        {"ticker": "JNJ", "dividend_yield": 3.0, "payout_ratio": 45, "earnings_growth": 6, "debt_to_equity": 0.4},
+        {"ticker": "KO", "dividend_yield": 3.1, "payout_ratio": 75, "earnings_growth": 4, "debt_to_equity": 1.5},
+        {"ticker": "AAPL", "dividend_yield": 0.5, "payout_ratio": 15, "earnings_growth": 12, "debt_to_equity": 0.3},
+        {"ticker": "MO", "dividend_yield": 8.0, "payout_ratio": 95, "earnings_growth": -2, "debt_to_equity": 2.0},
+    ]
+
+    def _index(self):
+        index = ScreenerIndex()
+        index.upsert_many(self.UNIVERSE)
+        return index
+
+    def test_filter_and_sort(self):
+        result = self._index().query(min_yield=1, min_grade="C", sort="yield")
+        assert [row["ticker"] for row in result["results"]] == ["JNJ"]
+        result = self._index().query(min_yield=1, sort="yield", descending=False)
+        assert [row["ticker"] for row in result["results"]] == ["JNJ", "KO", "MO"]
+
+    def test_sort_by_score_paginates(self):
+        index = self._index()
+        page = index.query(sort="score", limit=2, offset=1)
+        assert page["total"] == 4
+        scores = [row["score"] for row in index.query(sort="score")["results"]]
+        assert scores == sorted(scores, reverse=True)
+        assert [row["score"] for row in page["results"]] == scores[1:3]
+
+    def test_incremental_rescore(self):
+        index = self._index()
+        assert not index.upsert("JNJ", payout_ratio=45)
+        before = index.rows["JNJ"]["score"]
+        assert index.upsert("JNJ", payout_ratio=95)
+        assert index.rows["JNJ"]["score"] < before
+        assert index.query(min_grade="B")["total"] == 1
+        assert all(len(idx) == 4 for idx in index.indexes.values())
+
+    def test_batch_validation_is_atomic(self):
+        index = self._index()
+        with pytest.raises(ValueError):
+            index.upsert_many([{"ticker": "JNJ", "dividend_yield": 9.0}, {"ticker": "NEW"}])
+        assert index.rows["JNJ"]["dividend_yield"] == 3.0
+
+    def test_rejects_non_finite_values(self):
+        index = self._index()
+        for bad in (float("nan"), float("inf")):
+            with pytest.raises(ValueError):
+                index.upsert("JNJ", dividend_yield=bad)
+        assert index.rows["JNJ"]["dividend_yield"] == 3.0
+        assert all(len(idx) == 4 for idx in index.indexes.values())
+
+    def test_batch_merges_items_per_ticker(self):
+        index = ScreenerIndex()
+        rescored = index.upsert_many([
+            {"ticker": "NEW", "dividend_yield": 1, "payout_ratio": 2},
+            {"ticker": "new", "earnings_growth": 3, "dividend_yield": None},
+        ])
+        assert rescored == 1
+        assert index.rows["NEW"]["dividend_yield"] == 1.0
+        assert index.rows["NEW"]["earnings_growth"] == 3.0
+
+    def test_unfiltered_pages_at_the_end(self):
+        index = self._index()
+        tickers = [row["ticker"] for row in index.query(sort="yield", limit=10)["results"]]
+        assert tickers == ["MO", "KO", "JNJ", "AAPL"]
+        assert [row["ticker"] for row in index.query(sort="yield", offset=3, limit=10)["results"]] == ["AAPL"]
+        assert [row["ticker"] for row in index.query(sort="yield", descending=False, offset=1, limit=2)["results"]] == ["JNJ", "KO"]
+        assert index.query(sort="yield", offset=10)["results"] == []
+
+    def test_screener_endpoints(self, monkeypatch):
+        monkeypatch.setattr(screener_index, "rows", {})
+        monkeypatch.setattr(screener_index, "indexes", {field: [] for field in screener_index.indexes})
+        monkeypatch.setattr(main, "SCREENER_ADMIN_KEY", "test-admin-key")
+        response = client.post("/api/screener/fundamentals", json=self.UNIVERSE, headers={"X-Admin-Key": "test-admin-key"})
+        assert response.status_code == 200
+        assert response.json()["rescored"] == 4
+
+        response = client.get("/api/screener?min_yield=3&sort=yield&limit=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert [row["ticker"] for row in data["results"]] == ["MO", "KO"]
+
+    def test_screener_validation(self):
+        assert client.get("/api/screener?sort=bogus").status_code == 400
+        assert client.get("/api/screener?min_grade=Z").status_code == 422
+
+    def test_screener_writes_require_admin_key(self, monkeypatch):
+        token = create_access_token("user_1", "demo@example.com")
+        item = [{"ticker": "JNJ", "dividend_yield": 3, "payout_ratio": 45}]
+        monkeypatch.setattr(main, "SCREENER_ADMIN_KEY", None)
+        assert client.post(f"/api/screener/fundamentals?token={token}", json=item).status_code == 403
+        monkeypatch.setattr(main, "SCREENER_ADMIN_KEY", "test-admin-key")
+        assert client.post("/api/screener/fundamentals", json=item).status_code == 401
+        assert client.post(f"/api/screener/fundamentals?token={token}", json=item,
+                           headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+    def test_screener_write_validation(self, monkeypatch):
+        monkeypatch.setattr(main, "SCREENER_ADMIN_KEY", "test-admin-key")
+        monkeypatch.setattr(main, "SCREENER_MAX_BATCH", 2)
+        headers = {"X-Admin-Key": "test-admin-key"}
+        for bad in ("", "A|B", "X" * 40):
+            response = client.post("/api/screener/fundamentals", headers=headers,
+                                   json=[{"ticker": bad, "dividend_yield": 1, "payout_ratio": 1}])
+            assert response.status_code == 422
+        items = [{"ticker": f"T{i}", "dividend_yield": 1, "payout_ratio": 1} for i in range(3)]
+        assert client.post("/api/screener/fundamentals", headers=headers, json=items).status_code == 413
+        with pytest.raises(ValueError):
+            ScreenerIndex().upsert_many([{"ticker": "", "dividend_yield": 1, "payout_ratio": 1}])
+
+    def test_screener_rejects_nan_over_http(self, monkeypatch):
+        monkeypatch.setattr(main, "SCREENER_ADMIN_KEY", "test-admin-key")
+        body = '[{"ticker": "NANX", "dividend_yield": NaN, "payout_ratio": 10}]'
+        response = client.post("/api/screener/fundamentals", content=body,
+                               headers={"Content-Type": "application/json", "X-Admin-Key": "test-admin-key"})
+        assert response.status_code == 400
+        assert "NANX" not in screener_index.rows